@@ -0,0 +1,77 @@
+"""Content-addressed cache for Gemini JSON responses."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "youtube_summarize"
+MEMORY_MAXSIZE = 512
+
+_memory: "OrderedDict[str, str]" = OrderedDict()
+
+
+def make_key(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _path_for(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def remember(key: str, value: str) -> None:
+    """Store ``value`` in the in-process LRU only."""
+    _memory[key] = value
+    _memory.move_to_end(key)
+    if len(_memory) > MEMORY_MAXSIZE:
+        _memory.popitem(last=False)
+
+
+def get_memory(key: str) -> Optional[str]:
+    """Return the in-process LRU entry for ``key`` without touching the disk."""
+    value = _memory.get(key)
+    if value is not None:
+        _memory.move_to_end(key)
+    return value
+
+
+# The disk helpers leave the LRU alone, so async callers can run them in a worker thread
+# and update the LRU from the event loop.
+def read_disk(key: str) -> Optional[str]:
+    try:
+        return _path_for(key).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def write_disk(key: str, value: str) -> None:
+    path = _path_for(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(value, encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def get(key: str) -> Optional[str]:
+    value = get_memory(key)
+    if value is None:
+        value = read_disk(key)
+        if value is not None:
+            remember(key, value)
+    return value
+
+
+def put(key: str, value: str) -> None:
+    remember(key, value)
+    write_disk(key, value)
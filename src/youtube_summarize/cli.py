@@ -3,17 +3,51 @@
 from __future__ import annotations
 
 import argparse
-import json
+import asyncio
+import functools
+import itertools
+import shutil
 import sys
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Iterator, Union
 from urllib.parse import parse_qs, urlparse
 
-from google import genai
-
-from youtube_summarize.gemini import load_api_key, summarize_custom
+from google.genai import errors as genai_errors
+
+from youtube_summarize import jsonutil
+from youtube_summarize.gemini import (
+    build_json_config,
+    create_client,
+    load_api_key,
+    submit_batch,
+    submit_batch_poll,
+    summarize_custom_async,
+    validate_json,
+)
 from youtube_summarize.presets import DEFAULT_PRESET_ID, DEFAULT_PROMPT, load_preset_safe
 from youtube_summarize.prompts import SHARED_VIDEO_PROMPT
+from youtube_summarize.ratelimit import AsyncRateLimiter
+
+_YT_SHORT = frozenset({"youtu.be", "www.youtu.be"})
+_YT_LONG = frozenset({"www.youtube.com", "youtube.com"})
+_HTTP_PREFIX = ("http://", "https://")
+
+THINKING_LEVEL = "low"
+
+PROGRESS_WIDTH = 24
+_PROGRESS_DONE = "#" * PROGRESS_WIDTH
+_PROGRESS_TODO = "-" * PROGRESS_WIDTH
+
+PROMPT_METADATA_SUFFIX = """
+
+VIDEO METADATA (use exactly):
+- video_url: {video_url}
+- title: {title}
+- channel: {channel}
+- upload_date: {upload_date}
+
+Return ONLY valid JSON that matches the provided schema.
+"""
 
 
 def build_prompt(meta: Dict[str, str]) -> str:
@@ -49,76 +83,110 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--schema-json", help="Inline JSON Schema string.")
     ap.add_argument("--prompt", help="Prompt override.")
     ap.add_argument("--prompt-file", help="Path to a prompt text file.")
+    ap.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Maximum number of in-flight Gemini requests in batch mode (default: 8).",
+    )
+    ap.add_argument(
+        "--rpm",
+        type=float,
+        help="Cap Gemini requests per minute across all workers (default: no cap).",
+    )
+    ap.add_argument(
+        "--use-batch-api",
+        action="store_true",
+        help="Submit --input-file jobs through the Gemini Batch API (cheaper, but asynchronous).",
+    )
+    ap.add_argument(
+        "--validate",
+        action="store_true",
+        help="Check every response against the schema before writing it.",
+    )
+    ap.add_argument(
+        "--no-cache", action="store_true", help="Do not read or write the local response cache."
+    )
+    ap.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached responses but store fresh ones in the local cache.",
+    )
     return ap.parse_args()
 
 
-def normalize_video_url(value: str) -> str:
+def parse_video(value: str) -> tuple[str, str]:
+    """Return (normalized_url, video_id) from a single parse of a URL or bare video id."""
     raw = value.strip()
     if not raw:
-        return ""
-    if raw.startswith("http://") or raw.startswith("https://"):
+        return "", ""
+    if raw.startswith(_HTTP_PREFIX):
         parsed = urlparse(raw)
-        if parsed.netloc in {"youtu.be", "www.youtu.be"}:
+        if parsed.netloc in _YT_SHORT:
             video_id = parsed.path.lstrip("/")
-            return f"https://www.youtube.com/watch?v={video_id}"
-        if parsed.netloc in {"www.youtube.com", "youtube.com"}:
+            return f"https://www.youtube.com/watch?v={video_id}", video_id
+        if parsed.netloc in _YT_LONG:
             qs = parse_qs(parsed.query)
             video_id = qs.get("v", [""])[0]
             if video_id:
-                return f"https://www.youtube.com/watch?v={video_id}"
-        return raw
-    return f"https://www.youtube.com/watch?v={raw}"
+                return f"https://www.youtube.com/watch?v={video_id}", video_id
+            return raw, ""
+        return raw, raw
+    return f"https://www.youtube.com/watch?v={raw}", raw
+
+
+def normalize_video_url(value: str) -> str:
+    return parse_video(value)[0]
 
 
 def extract_video_id(value: str) -> str:
-    raw = value.strip()
-    if not raw:
-        return ""
-    if raw.startswith("http://") or raw.startswith("https://"):
-        parsed = urlparse(raw)
-        if parsed.netloc in {"youtu.be", "www.youtu.be"}:
-            return parsed.path.lstrip("/")
-        if parsed.netloc in {"www.youtube.com", "youtube.com"}:
-            qs = parse_qs(parsed.query)
-            return qs.get("v", [""])[0]
-    return raw
+    return parse_video(value)[1]
 
 
-def load_inputs(args: argparse.Namespace) -> Iterable[str]:
+def load_inputs(args: argparse.Namespace) -> Iterator[str]:
     if args.input_file:
-        path = Path(args.input_file)
-        lines = path.read_text(encoding="utf-8").splitlines()
-        return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
-    if args.video_url:
-        return [args.video_url]
-    return []
+        with open(args.input_file, encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+    elif args.video_url:
+        yield args.video_url
+
 
 def render_progress(index: int, total: int, video_id: str) -> None:
     if total <= 1:
         return
-    width = 24
-    filled = int((index / total) * width)
-    bar = "#" * filled + "-" * (width - filled)
-    msg = f"[{index}/{total}] [{bar}] {video_id}"
-    print(msg, file=sys.stderr)
+    # Bound stderr writes to ~200 lines however large the batch is.
+    if index % max(1, total // 200) and index != total:
+        return
+    filled = index * PROGRESS_WIDTH // total
+    bar = _PROGRESS_DONE[:filled] + _PROGRESS_TODO[filled:]
+    print(f"[{index}/{total}] [{bar}] {video_id}", file=sys.stderr)
+
+
+def _skip_progress(index: int, total: int, video_id: str) -> None:
+    return None
 
 
 def main() -> None:
     args = parse_args()
-    inputs = load_inputs(args)
-    if not inputs:
+    stream = load_inputs(args)
+    first = next(stream, None)
+    if first is None:
         raise SystemExit("Provide a video URL/ID or --input-file.")
+    inputs: Iterable[str] = itertools.chain([first], stream)
     if args.input_file and not args.outdir and args.out == "-":
         raise SystemExit("Batch mode requires --outdir to write results per video.")
 
     api_key = load_api_key()
-    client = genai.Client(api_key=api_key)
+    client = create_client(api_key, max_connections=max(1, args.concurrency) * 2)
 
     preset_prompt = None
     if args.schema_json:
-        schema = json.loads(args.schema_json)
+        schema = jsonutil.loads(args.schema_json)
     elif args.schema:
-        payload = json.loads(Path(args.schema).read_text(encoding="utf-8"))
+        payload = jsonutil.loads(Path(args.schema).read_bytes())
         if isinstance(payload, dict) and "schema" in payload:
             preset_prompt = payload.get("prompt")
             schema = payload.get("schema")
@@ -144,49 +212,177 @@ def main() -> None:
     base_prompt = base_prompt.strip()
     prompt_template = SHARED_VIDEO_PROMPT if base_prompt == SHARED_VIDEO_PROMPT else base_prompt
 
-    def render_prompt(meta: Dict[str, str]) -> str:
-        return f"""{prompt_template}
-
-VIDEO METADATA (use exactly):
-- video_url: {meta["video_url"]}
-- title: {meta.get("title","")}
-- channel: {meta.get("channel","")}
-- upload_date: {meta.get("upload_date","")}
-
-Return ONLY valid JSON that matches the provided schema.
-"""
+    # Constant parts are joined once; user braces are escaped so only metadata fields substitute.
+    prompt_format = prompt_template.replace("{", "{{").replace("}", "}}") + PROMPT_METADATA_SUFFIX
 
+    progress = render_progress if sys.stderr.isatty() else _skip_progress
     outdir = Path(args.outdir) if args.outdir else None
     if outdir:
         outdir.mkdir(parents=True, exist_ok=True)
+        total = sum(1 for _ in load_inputs(args)) if progress is render_progress else 0
+    else:
+        # Single-output mode only ever writes the first input.
+        inputs = [first]
+        total = 1
 
-    total = len(inputs)
-    for idx, raw_input in enumerate(inputs, start=1):
-        video_url = normalize_video_url(raw_input)
+    def prepare(idx: int, raw_input: str) -> tuple[str, Dict[str, str], str]:
+        video_url, video_id = parse_video(raw_input)
         meta = {
             "video_url": video_url,
             "title": args.title,
             "channel": args.channel,
             "upload_date": args.upload_date,
         }
-        video_id = extract_video_id(video_url) or f"video_{idx}"
-        render_progress(idx, total, video_id)
-        prompt = render_prompt(meta)
-        payload = summarize_custom(client=client, model=args.model, prompt=prompt, meta=meta, schema=schema)
-
-        if outdir:
-            out_path = outdir / f"{video_id}.json"
-            out_path.write_text(payload, encoding="utf-8")
-            continue
-
-        if args.out == "-":
-            print(payload)
-            continue
-
-        out_path = Path(args.out)
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(payload, encoding="utf-8")
-        break
+        return video_id or f"video_{idx}", meta, prompt_format.format_map(meta)
+
+    invalid: list[str] = []
+
+    def report_invalid(video_id: str, exc: ValueError) -> None:
+        invalid.append(video_id)
+        print(f"{video_id}: skipped, {exc}", file=sys.stderr)
+
+    async def _run(items: Iterable[str]) -> None:
+        cfg = build_json_config(schema, THINKING_LEVEL)
+        # Validating inside the request keeps responses that fail --validate out of the cache.
+        validate = functools.partial(validate_json, schema=schema) if args.validate else None
+        limiter = AsyncRateLimiter(args.rpm) if args.rpm else None
+        lock = asyncio.Lock()
+        pending = enumerate(items, start=1)
+        # Repeats of an in-flight URL await its future instead of re-sending the request. Futures
+        # are dropped once they resolve, so payloads are not kept for the rest of the run; later
+        # repeats copy the first output file (or reuse the validation error) instead.
+        inflight: Dict[str, asyncio.Future[str]] = {}
+        finished: Dict[str, Union[Path, ValueError]] = {}
+        done = 0
+        duplicates = 0
+
+        async def _summarize(meta: Dict[str, str], prompt: str) -> str:
+            return await summarize_custom_async(
+                client=client,
+                model=args.model,
+                prompt=prompt,
+                meta=meta,
+                schema=schema,
+                thinking_level=THINKING_LEVEL,
+                use_cache=not args.no_cache,
+                refresh_cache=args.refresh_cache,
+                cfg=cfg,
+                limiter=limiter,
+                validate=validate,
+            )
+
+        async def _one(idx: int, raw_input: str) -> None:
+            nonlocal done, duplicates
+            video_id, meta, prompt = prepare(idx, raw_input)
+            video_url = meta["video_url"]
+            first = finished.get(video_url)
+            future = inflight.get(video_url)
+            payload = None
+            if first is not None or future is not None:
+                duplicates += 1
+            try:
+                if isinstance(first, ValueError):
+                    raise first
+                if first is None and future is not None:
+                    payload = await future
+                elif first is None:
+                    future = asyncio.get_running_loop().create_future()
+                    inflight[video_url] = future
+                    try:
+                        payload = await _summarize(meta, prompt)
+                    except Exception as exc:
+                        future.set_exception(exc)
+                        future.exception()  # mark retrieved; the error is re-raised below
+                        if isinstance(exc, ValueError) and outdir:
+                            finished[video_url] = exc
+                        raise
+                    finally:
+                        del inflight[video_url]
+                    future.set_result(payload)
+            except ValueError as exc:
+                # Failed --validate: report it and let the rest of the batch finish.
+                report_invalid(video_id, exc)
+            else:
+                # No await between here and recording the path, so a repeat that misses the
+                # in-flight future always finds the finished file.
+                if outdir:
+                    out_path = outdir / f"{video_id}.json"
+                    if payload is not None:
+                        out_path.write_bytes(payload.encode("utf-8"))
+                        finished.setdefault(video_url, out_path)
+                    elif first != out_path:
+                        shutil.copyfile(first, out_path)
+                elif args.out == "-":
+                    print(payload)
+                else:
+                    out_path = Path(args.out)
+                    out_path.parent.mkdir(parents=True, exist_ok=True)
+                    out_path.write_bytes(payload.encode("utf-8"))
+            async with lock:
+                done += 1
+                progress(done, total, video_id)
+
+        async def _worker() -> None:
+            # Workers share one iterator, so inputs are read lazily as request slots free up.
+            for idx, raw_input in pending:
+                await _one(idx, raw_input)
+
+        await asyncio.gather(*(_worker() for _ in range(max(1, args.concurrency))))
+        if duplicates:
+            print(f"Skipped {duplicates} duplicate input(s).", file=sys.stderr)
+
+    if args.use_batch_api and args.input_file and outdir:
+        inputs = list(inputs)
+        prepared = [prepare(idx, raw_input) for idx, raw_input in enumerate(inputs, start=1)]
+        prompts: Dict[str, str] = {}
+        video_ids: Dict[str, list[str]] = {}
+        for video_id, meta, prompt in prepared:
+            prompts.setdefault(meta["video_url"], prompt)
+            video_ids.setdefault(meta["video_url"], []).append(video_id)
+        if len(prompts) < len(prepared):
+            print(f"Skipped {len(prepared) - len(prompts)} duplicate input(s).", file=sys.stderr)
+        try:
+            batch_name = submit_batch(
+                client=client,
+                model=args.model,
+                schema=schema,
+                thinking_level=THINKING_LEVEL,
+                items=[(prompt, video_url) for video_url, prompt in prompts.items()],
+            )
+        except genai_errors.APIError as exc:
+            msg = f"Batch API rejected the job ({exc}); falling back to direct requests."
+            print(msg, file=sys.stderr)
+        else:
+            print(f"Submitted Gemini batch {batch_name} ({len(prompts)} videos).", file=sys.stderr)
+            keys = list(prompts)
+            written = rejected = 0
+            for video_url, payload in submit_batch_poll(client=client, name=batch_name, keys=keys):
+                if args.validate:
+                    try:
+                        validate_json(payload, schema)
+                    except ValueError as exc:
+                        report_invalid(video_ids[video_url][0], exc)
+                        rejected += 1
+                        continue
+                data = payload.encode("utf-8")
+                for video_id in video_ids[video_url]:
+                    (outdir / f"{video_id}.json").write_bytes(data)
+                written += 1
+                progress(written, len(keys), video_ids[video_url][0])
+            if written + rejected < len(keys):
+                missing = len(keys) - written - rejected
+                msg = f"Batch {batch_name}: {missing} video(s) returned no result."
+                print(msg, file=sys.stderr)
+            _exit_if_invalid(invalid)
+            return
+
+    asyncio.run(_run(inputs))
+    _exit_if_invalid(invalid)
+
+
+def _exit_if_invalid(invalid: list[str]) -> None:
+    if invalid:
+        raise SystemExit(f"{len(invalid)} video(s) failed schema validation.")
 
 
 if __name__ == "__main__":
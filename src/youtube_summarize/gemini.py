@@ -2,20 +2,53 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
+import hashlib
+import io
 import os
 import random
 import time
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
+import httpx
+import jsonschema
 from dotenv import load_dotenv
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
 
+from youtube_summarize import cache, jsonutil
+from youtube_summarize.ratelimit import AsyncRateLimiter
 from youtube_summarize.schemas import VideoExtraction
 
+BATCH_OK_STATES = frozenset(
+    {types.JobState.JOB_STATE_SUCCEEDED, types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED}
+)
+BATCH_FINAL_STATES = frozenset(
+    {
+        types.JobState.JOB_STATE_SUCCEEDED,
+        types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED,
+        types.JobState.JOB_STATE_FAILED,
+        types.JobState.JOB_STATE_CANCELLED,
+        types.JobState.JOB_STATE_EXPIRED,
+    }
+)
 
+# Rate limiting, request timeouts and server-side failures; anything else is treated as permanent.
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+RETRYABLE_EXCEPTIONS = (TimeoutError, ConnectionError, httpx.TransportError)
+RETRY_AFTER_CAP = 60.0
+
+# Checks a response text and raises ValueError if it must not be returned or cached.
+Validator = Callable[[str], Any]
+
+_VIDEO_EXTRACTION_SCHEMA = VideoExtraction.model_json_schema()
+_META_VALIDATOR = jsonschema.Draft202012Validator(jsonschema.Draft202012Validator.META_SCHEMA)
+
+@functools.lru_cache(maxsize=1)
 def load_api_key() -> str:
+    # A missing key raises, and exceptions are not cached, so a later call can still succeed.
     load_dotenv()
     api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
     if not api_key:
@@ -23,36 +56,345 @@ def load_api_key() -> str:
     return api_key
 
 
-def backoff_sleep(attempt: int, base: float = 1.0, cap: float = 20.0) -> None:
+def create_client(
+    api_key: str, max_connections: int = 100, keepalive_expiry: float = 30.0
+) -> genai.Client:
+    """Create a Gemini client with one HTTP/2 connection pool, sized for ``max_connections``.
+
+    Every request made through the returned client reuses that pool, so concurrent calls
+    share warm TLS connections instead of handshaking per request.
+    """
+    pool_args = {
+        "http2": True,
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    }
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(client_args=pool_args, async_client_args=pool_args),
+    )
+
+
+def _backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float]) -> float:
+    if retry_after is not None:
+        return min(RETRY_AFTER_CAP, retry_after)
     delay = min(cap, base * (2**attempt))
-    delay *= 0.7 + random.random() * 0.6
-    time.sleep(delay)
+    return delay * (0.7 + random.random() * 0.6)
 
 
-def gemini_json(
-    client: genai.Client,
+def backoff_sleep(
+    attempt: int, base: float = 1.0, cap: float = 20.0, retry_after: Optional[float] = None
+) -> None:
+    time.sleep(_backoff_delay(attempt, base, cap, retry_after))
+
+
+async def backoff_sleep_async(
+    attempt: int, base: float = 1.0, cap: float = 20.0, retry_after: Optional[float] = None
+) -> None:
+    await asyncio.sleep(_backoff_delay(attempt, base, cap, retry_after))
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, RETRYABLE_EXCEPTIONS)
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def parse_schema_json(schema_json_text: str) -> Any:
+    """Parse a user-supplied schema string, memoized; treat the result as read-only."""
+    return jsonutil.loads(schema_json_text)
+
+
+def _canonical_schema(schema: Dict[str, Any]) -> bytes:
+    # Serialized on every call: schema dicts can be mutated in place, so identity is not content.
+    return jsonutil.dumps_sorted(schema)
+
+
+def schema_key(schema: Dict[str, Any]) -> bytes:
+    """Return a 16-byte digest identifying ``schema`` regardless of key order."""
+    return hashlib.blake2b(_canonical_schema(schema), digest_size=16).digest()
+
+
+@functools.lru_cache(maxsize=32)
+def _validator_for(schema_text: bytes) -> jsonschema.protocols.Validator:
+    schema = jsonutil.loads(schema_text)
+    return jsonschema.validators.validator_for(schema)(schema)
+
+
+@functools.lru_cache(maxsize=256)
+def _schema_error(schema_text: bytes) -> Optional[str]:
+    schema = jsonutil.loads(schema_text)
+    error = jsonschema.exceptions.best_match(_META_VALIDATOR.iter_errors(schema))
+    if error is None:
+        return None
+    path = "/".join(str(part) for part in error.absolute_path) or "<root>"
+    return f"Invalid JSON Schema at {path}: {error.message}"
+
+
+def check_schema(schema: Dict[str, Any]) -> None:
+    """Raise ValueError if ``schema`` is not a valid JSON Schema; results are cached per schema."""
+    error = _schema_error(_canonical_schema(schema))
+    if error is not None:
+        raise ValueError(error)
+
+
+def validate_json(raw: str, schema: Dict[str, Any]) -> Any:
+    """Parse ``raw`` and check it against ``schema``, reusing one compiled validator per schema."""
+    instance = jsonutil.loads(raw)
+    validator = _validator_for(_canonical_schema(schema))
+    error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+    if error is not None:
+        path = "/".join(str(part) for part in error.absolute_path) or "<root>"
+        raise ValueError(f"Response does not match schema at {path}: {error.message}")
+    return instance
+
+
+def response_cache_key(
     model: str,
     schema: Dict[str, Any],
     contents: types.Content,
     thinking_level: Optional[str] = None,
-    max_retries: int = 6,
 ) -> str:
-    cfg = types.GenerateContentConfig(
+    return cache.make_key(
+        model,
+        schema_key(schema).hex(),
+        contents.model_dump_json(exclude_none=True),
+        thinking_level or "",
+    )
+
+
+def build_json_config(
+    schema: Dict[str, Any],
+    thinking_level: Optional[str] = None,
+) -> types.GenerateContentConfig:
+    """Build the JSON-mode request config.
+
+    Batch callers can build it once and pass it as ``cfg``; it must match the ``schema`` and
+    ``thinking_level`` given alongside it, which still feed the response cache key.
+    """
+    return types.GenerateContentConfig(
         response_mime_type="application/json",
         response_json_schema=schema,
         thinking_config=types.ThinkingConfig(thinking_level=thinking_level) if thinking_level else None,
     )
 
-    last_err: Optional[Exception] = None
-    for attempt in range(max_retries):
+
+def _usable(cached: Optional[str], validate: Optional[Validator]) -> Optional[str]:
+    if cached is None or validate is None:
+        return cached
+    try:
+        validate(cached)
+    except ValueError:
+        return None
+    return cached
+
+
+def _cacheable(text: str, key: Optional[str], validate: Optional[Validator]) -> bool:
+    """Run ``validate`` on fresh output (ValueError propagates); True if it should be cached."""
+    if validate is not None:
+        validate(text)
+        return bool(key and text)
+    if not key:
+        return False
+    try:
+        jsonutil.loads(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _cached_response(key: str, validate: Optional[Validator]) -> Optional[str]:
+    return _usable(cache.get(key), validate)
+
+
+async def _cached_response_async(key: str, validate: Optional[Validator]) -> Optional[str]:
+    # Memory hits are served inline; disk reads go to a thread so they don't stall the loop.
+    cached = cache.get_memory(key)
+    if cached is None:
+        cached = await asyncio.to_thread(cache.read_disk, key)
+        if cached is not None:
+            cache.remember(key, cached)
+    return _usable(cached, validate)
+
+
+def _checked_response(text: str, key: Optional[str], validate: Optional[Validator]) -> str:
+    if _cacheable(text, key, validate):
+        cache.put(key, text)
+    return text
+
+
+async def _checked_response_async(
+    text: str, key: Optional[str], validate: Optional[Validator]
+) -> str:
+    if _cacheable(text, key, validate):
+        cache.remember(key, text)
+        await asyncio.to_thread(cache.write_disk, key, text)
+    return text
+
+
+class _RetryPolicy:
+    """Retry, backoff and URL-only fallback decisions shared by every Gemini request loop.
+
+    Loops send ``policy.contents`` and hand each failure to ``on_error``, which raises once the
+    error is final and otherwise returns the seconds to wait before trying again.
+    """
+
+    def __init__(
+        self,
+        contents: types.Content,
+        max_retries: int,
+        fallback_contents: Optional[types.Content] = None,
+        limiter: Optional[AsyncRateLimiter] = None,
+    ) -> None:
+        self.contents = contents
+        self._fallback = fallback_contents
+        self._max_retries = max_retries
+        self._limiter = limiter
+        self._attempt = 0
+
+    def on_error(self, exc: Exception) -> float:
+        if self._fallback is not None and "Unsupported MIME type" in str(exc):
+            # Gemini could not fetch the video as file data; resend with the URL in the prompt.
+            self.contents, self._fallback = self._fallback, None
+            return 0.0
+        if not is_retryable(exc):
+            raise RuntimeError(f"Gemini request failed: {exc!r}") from exc
+        if self._limiter and isinstance(exc, genai_errors.APIError) and exc.code == 429:
+            self._limiter.on_throttle()
+        attempt, self._attempt = self._attempt, self._attempt + 1
+        if self._attempt >= self._max_retries:
+            raise RuntimeError(f"Gemini failed after retries: {exc!r}") from exc
+        return _backoff_delay(attempt, 1.0, 20.0, retry_after_seconds(exc))
+
+
+def gemini_json(
+    client: genai.Client,
+    model: str,
+    schema: Dict[str, Any],
+    contents: types.Content,
+    thinking_level: Optional[str] = None,
+    max_retries: int = 6,
+    use_cache: bool = False,
+    refresh_cache: bool = False,
+    cfg: Optional[types.GenerateContentConfig] = None,
+    validate: Optional[Validator] = None,
+    fallback_contents: Optional[types.Content] = None,
+) -> str:
+    key = response_cache_key(model, schema, contents, thinking_level) if use_cache else None
+    if key and not refresh_cache:
+        cached = _cached_response(key, validate)
+        if cached is not None:
+            return cached
+
+    cfg = cfg or build_json_config(schema, thinking_level)
+    policy = _RetryPolicy(contents, max_retries, fallback_contents)
+
+    while True:
         try:
-            resp = client.models.generate_content(model=model, contents=contents, config=cfg)
-            return resp.text
+            # Stream so chunks are consumed while the model is still generating.
+            buffer = io.StringIO()
+            stream = client.models.generate_content_stream(
+                model=model, contents=policy.contents, config=cfg
+            )
+            for chunk in stream:
+                if chunk.text:
+                    buffer.write(chunk.text)
+            break
         except Exception as exc:
-            last_err = exc
-            backoff_sleep(attempt)
+            time.sleep(policy.on_error(exc))
 
-    raise RuntimeError(f"Gemini failed after retries: {last_err!r}")
+    return _checked_response(buffer.getvalue(), key, validate)
+
+
+async def gemini_json_async(
+    client: genai.Client,
+    model: str,
+    schema: Dict[str, Any],
+    contents: types.Content,
+    thinking_level: Optional[str] = None,
+    max_retries: int = 6,
+    use_cache: bool = False,
+    refresh_cache: bool = False,
+    cfg: Optional[types.GenerateContentConfig] = None,
+    limiter: Optional[AsyncRateLimiter] = None,
+    validate: Optional[Validator] = None,
+    fallback_contents: Optional[types.Content] = None,
+) -> str:
+    key = response_cache_key(model, schema, contents, thinking_level) if use_cache else None
+    if key and not refresh_cache:
+        cached = await _cached_response_async(key, validate)
+        if cached is not None:
+            return cached
+
+    cfg = cfg or build_json_config(schema, thinking_level)
+    policy = _RetryPolicy(contents, max_retries, fallback_contents, limiter)
+
+    while True:
+        if limiter:
+            await limiter.acquire()
+        try:
+            buffer = io.StringIO()
+            stream = await client.aio.models.generate_content_stream(
+                model=model, contents=policy.contents, config=cfg
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    buffer.write(chunk.text)
+            if limiter:
+                limiter.on_success()
+            break
+        except Exception as exc:
+            await asyncio.sleep(policy.on_error(exc))
+
+    return await _checked_response_async(buffer.getvalue(), key, validate)
+
+
+def video_contents(video_url: str, prompt: str) -> types.Content:
+    """Build request contents for one video: the video first, then the prompt."""
+    return types.Content(
+        parts=[
+            types.Part(file_data=types.FileData(file_uri=video_url)),
+            types.Part(text=prompt),
+        ]
+    )
+
+
+def _url_only_contents(video_url: str, prompt: str) -> types.Content:
+    return types.Content(parts=[types.Part(text=f"{prompt}\n\nVIDEO URL: {video_url}")])
+
+
+def summarize_video_raw(
+    client: genai.Client,
+    model: str,
+    prompt: str,
+    meta: Dict[str, str],
+    thinking_level: Optional[str] = "low",
+) -> str:
+    """Return the VideoExtraction JSON text as produced by Gemini, without re-validating it."""
+    return summarize_custom(
+        client=client,
+        model=model,
+        prompt=prompt,
+        meta=meta,
+        schema=_VIDEO_EXTRACTION_SCHEMA,
+        thinking_level=thinking_level,
+    )
 
 
 def summarize_video(
@@ -62,35 +404,10 @@ def summarize_video(
     meta: Dict[str, str],
     thinking_level: Optional[str] = "low",
 ) -> VideoExtraction:
-    contents = types.Content(
-        parts=[
-            types.Part(file_data=types.FileData(file_uri=meta["video_url"])),
-            types.Part(text=prompt),
-        ]
+    raw = summarize_video_raw(
+        client=client, model=model, prompt=prompt, meta=meta, thinking_level=thinking_level
     )
-
-    try:
-        raw = gemini_json(
-            client=client,
-            model=model,
-            schema=VideoExtraction.model_json_schema(),
-            contents=contents,
-            thinking_level=thinking_level,
-        )
-        return VideoExtraction.model_validate_json(raw)
-    except RuntimeError as exc:
-        if "Unsupported MIME type" not in str(exc):
-            raise
-        fallback_prompt = f"{prompt}\n\nVIDEO URL: {meta['video_url']}"
-        contents = types.Content(parts=[types.Part(text=fallback_prompt)])
-        raw = gemini_json(
-            client=client,
-            model=model,
-            schema=VideoExtraction.model_json_schema(),
-            contents=contents,
-            thinking_level=thinking_level,
-        )
-        return VideoExtraction.model_validate_json(raw)
+    return VideoExtraction.model_validate_json(raw)
 
 
 def summarize_custom(
@@ -100,38 +417,146 @@ def summarize_custom(
     meta: Dict[str, str],
     schema: Dict[str, Any],
     thinking_level: Optional[str] = "low",
+    use_cache: bool = False,
+    refresh_cache: bool = False,
+    cfg: Optional[types.GenerateContentConfig] = None,
+    validate: Optional[Validator] = None,
 ) -> str:
-    contents = types.Content(
-        parts=[
-            types.Part(file_data=types.FileData(file_uri=meta["video_url"])),
-            types.Part(text=prompt),
-        ]
+    return gemini_json(
+        client=client,
+        model=model,
+        schema=schema,
+        contents=video_contents(meta["video_url"], prompt),
+        fallback_contents=_url_only_contents(meta["video_url"], prompt),
+        thinking_level=thinking_level,
+        use_cache=use_cache,
+        refresh_cache=refresh_cache,
+        cfg=cfg,
+        validate=validate,
     )
 
-    try:
-        return gemini_json(
-            client=client,
-            model=model,
-            schema=schema,
-            contents=contents,
-            thinking_level=thinking_level,
-        )
-    except RuntimeError as exc:
-        if "Unsupported MIME type" not in str(exc):
-            raise
-        fallback_prompt = f"{prompt}\n\nVIDEO URL: {meta['video_url']}"
-        contents = types.Content(parts=[types.Part(text=fallback_prompt)])
-        return gemini_json(
-            client=client,
-            model=model,
-            schema=schema,
-            contents=contents,
-            thinking_level=thinking_level,
-        )
+
+async def summarize_custom_async(
+    client: genai.Client,
+    model: str,
+    prompt: str,
+    meta: Dict[str, str],
+    schema: Dict[str, Any],
+    thinking_level: Optional[str] = "low",
+    use_cache: bool = False,
+    refresh_cache: bool = False,
+    cfg: Optional[types.GenerateContentConfig] = None,
+    limiter: Optional[AsyncRateLimiter] = None,
+    validate: Optional[Validator] = None,
+) -> str:
+    return await gemini_json_async(
+        client=client,
+        model=model,
+        schema=schema,
+        contents=video_contents(meta["video_url"], prompt),
+        fallback_contents=_url_only_contents(meta["video_url"], prompt),
+        thinking_level=thinking_level,
+        use_cache=use_cache,
+        refresh_cache=refresh_cache,
+        cfg=cfg,
+        validate=validate,
+        limiter=limiter,
+    )
+
+
+async def summarize_custom_stream(
+    client: genai.Client,
+    model: str,
+    prompt: str,
+    meta: Dict[str, str],
+    schema: Dict[str, Any],
+    thinking_level: Optional[str] = "low",
+    max_retries: int = 6,
+) -> AsyncIterator[str]:
+    """Yield the JSON response text chunk by chunk as Gemini generates it.
+
+    Failures are retried only until the first chunk has been yielded; after that they raise.
+    """
+    cfg = build_json_config(schema, thinking_level)
+    policy = _RetryPolicy(
+        video_contents(meta["video_url"], prompt),
+        max_retries,
+        fallback_contents=_url_only_contents(meta["video_url"], prompt),
+    )
+
+    while True:
+        started = False
+        try:
+            stream = await client.aio.models.generate_content_stream(
+                model=model, contents=policy.contents, config=cfg
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    started = True
+                    yield chunk.text
+            return
+        except Exception as exc:
+            if started:
+                raise RuntimeError(f"Gemini request failed: {exc!r}") from exc
+            await asyncio.sleep(policy.on_error(exc))
+
+
+def submit_batch(
+    client: genai.Client,
+    model: str,
+    schema: Dict[str, Any],
+    items: Sequence[Tuple[str, str]],
+    thinking_level: Optional[str] = "low",
+) -> str:
+    """Submit (prompt, video_url) pairs as one Gemini batch job and return its name."""
+    cfg = build_json_config(schema, thinking_level)
+    requests = [
+        types.InlinedRequest(contents=[video_contents(video_url, prompt)], config=cfg)
+        for prompt, video_url in items
+    ]
+    job = client.batches.create(model=model, src=requests)
+    return job.name
+
+
+def batch_results(client: genai.Client, name: str) -> Optional[List[Optional[str]]]:
+    """Return each item's JSON text (None if it failed), or None while the job is running."""
+    job = client.batches.get(name=name)
+    if job.state not in BATCH_FINAL_STATES:
+        return None
+    if job.state not in BATCH_OK_STATES:
+        raise RuntimeError(f"Gemini batch {name} ended in state {job.state}: {job.error!r}")
+
+    responses = (job.dest.inlined_responses if job.dest else None) or []
+    return [
+        None if item.error or not item.response else item.response.text or None
+        for item in responses
+    ]
+
+
+def submit_batch_poll(
+    client: genai.Client,
+    name: str,
+    keys: Sequence[str],
+    poll_interval: float = 30.0,
+) -> Iterator[Tuple[str, str]]:
+    """Wait for a batch job and yield (key, json_text) for each successful response.
+
+    Responses come back in submission order, so ``keys`` must match the order of the
+    items passed to ``submit_batch``. Failed rows are skipped.
+    """
+    results = batch_results(client, name)
+    while results is None:
+        time.sleep(poll_interval)
+        results = batch_results(client, name)
+
+    for key, text in zip(keys, results):
+        if text:
+            yield key, text
 
 
 def extraction_to_json(extraction: VideoExtraction) -> str:
-    return json.dumps(extraction.model_dump(), indent=2)
+    # ensure_ascii keeps the \uXXXX escapes json.dumps wrote, so saved files stay byte-identical.
+    return extraction.model_dump_json(indent=2, ensure_ascii=True)
 
 
 def infer_schema_from_prompt(
@@ -161,4 +586,4 @@ User prompt:
         contents=contents,
         thinking_level=thinking_level,
     )
-    return json.loads(raw)
+    return jsonutil.loads(raw)
@@ -2,34 +2,63 @@
 
 from __future__ import annotations
 
+import functools
 import json
-from pathlib import Path
+import os
 from typing import Any, Optional
 
-ROOT_DIR = Path(__file__).resolve().parents[2]
-PRESETS_DIR = ROOT_DIR / "src" / "data" / "presets"
+from youtube_summarize import jsonutil
+
+# Plain strings built with os.path: no stat()/symlink resolution at import time.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PRESETS_DIR = os.path.join(ROOT_DIR, "src", "data", "presets")
 DEFAULT_PRESET_ID = "summary_keywords"
 DEFAULT_PROMPT = "Summarize the YouTube video. Return a short summary and a list of keywords."
 
 
 def list_presets() -> list[dict[str, Any]]:
+    # Not memoized: rewriting a preset in place leaves the directory mtime unchanged, and another
+    # worker's save would not clear this process's memo. A scan is cheap next to a Gemini call.
     presets = []
-    if not PRESETS_DIR.exists():
+    try:
+        with os.scandir(PRESETS_DIR) as entries:
+            names = sorted(e.name for e in entries if e.name.endswith(".json") and e.is_file())
+    except FileNotFoundError:
         return presets
-    for path in sorted(PRESETS_DIR.glob("*.json")):
+    for name in names:
+        preset_id = name[: -len(".json")]
         try:
-            payload = json.loads(path.read_text(encoding="utf-8"))
-            presets.append({"id": path.stem, "name": payload.get("name", path.stem)})
+            payload = load_preset(preset_id)
+            presets.append({"id": preset_id, "name": payload.get("name", preset_id)})
         except Exception:
             continue
     return presets
 
 
+def _preset_path(preset_id: str) -> str:
+    return os.path.join(PRESETS_DIR, f"{preset_id}.json")
+
+
+def preset_mtime_ns(preset_id: str) -> Optional[int]:
+    try:
+        return os.stat(_preset_path(preset_id)).st_mtime_ns
+    except OSError:
+        return None
+
+
 def load_preset(preset_id: str) -> dict[str, Any]:
-    path = PRESETS_DIR / f"{preset_id}.json"
-    if not path.exists():
-        raise FileNotFoundError(preset_id)
-    return json.loads(path.read_text(encoding="utf-8"))
+    try:
+        mtime_ns = os.stat(_preset_path(preset_id)).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(preset_id) from None
+    return _load_preset_cached(preset_id, mtime_ns)
+
+
+@functools.lru_cache(maxsize=64)
+def _load_preset_cached(preset_id: str, mtime_ns: int) -> dict[str, Any]:
+    # Keyed on mtime so edits on disk are picked up; callers share the dict, so don't mutate it.
+    with open(_preset_path(preset_id), "rb") as handle:
+        return jsonutil.loads(handle.read())
 
 
 def load_preset_safe(preset_id: str) -> Optional[dict[str, Any]]:
@@ -40,9 +69,11 @@ def load_preset_safe(preset_id: str) -> Optional[dict[str, Any]]:
 
 
 def save_preset(preset_id: str, payload: dict[str, Any]) -> None:
-    PRESETS_DIR.mkdir(parents=True, exist_ok=True)
-    path = PRESETS_DIR / f"{preset_id}.json"
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.makedirs(PRESETS_DIR, exist_ok=True)
+    with open(_preset_path(preset_id), "w", encoding="utf-8") as handle:
+        # stdlib json keeps ASCII escapes, matching preset files written before orjson.
+        handle.write(json.dumps(payload, indent=2))
+    _load_preset_cached.cache_clear()
 
 
 def sanitize_preset_id(value: str) -> str:
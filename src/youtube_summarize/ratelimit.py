@@ -0,0 +1,55 @@
+"""Request-rate limiting shared by concurrent Gemini calls."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """Token bucket refilled at ``rate`` requests per ``period`` seconds.
+
+    The rate is adjusted AIMD-style: halved whenever the provider throttles us and
+    nudged back up by one request per period on each success, never above the
+    configured maximum.
+    """
+
+    def __init__(
+        self, rate: float, period: float = 60.0, burst: float = 1.0, min_rate: float = 1.0
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.max_rate = rate
+        self.rate = rate
+        self.period = period
+        self.burst = max(1.0, burst)
+        self.min_rate = min(min_rate, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock, so permits are handed out in arrival order.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                refill = (now - self._updated) * self.rate / self.period
+                self._tokens = min(self.burst, self._tokens + refill)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) * self.period / self.rate)
+
+    def on_throttle(self) -> None:
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + 1.0)
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
@@ -2,50 +2,155 @@
 
 from __future__ import annotations
 
-import json
-from pathlib import Path
-from typing import Any, Dict, Optional
+import asyncio
+import functools
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
 from urllib.parse import parse_qs, urlparse
 
 from fastapi import FastAPI, Form, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from google import genai
-
-from youtube_summarize.gemini import infer_schema_from_prompt, load_api_key, summarize_custom
+from google.genai import errors as genai_errors
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from pydantic import BaseModel, Field, ValidationError
+
+from youtube_summarize import cache, jsonutil
+from youtube_summarize.gemini import (
+    batch_results,
+    check_schema,
+    create_client,
+    infer_schema_from_prompt,
+    load_api_key,
+    parse_schema_json,
+    schema_key,
+    submit_batch,
+    summarize_custom_async,
+    summarize_custom_stream,
+)
 from youtube_summarize.presets import (
     DEFAULT_PRESET_ID,
     DEFAULT_PROMPT,
     list_presets,
     load_preset,
     load_preset_safe,
+    preset_mtime_ns,
     sanitize_preset_id,
     save_preset,
 )
 from youtube_summarize.prompts import SHARED_VIDEO_PROMPT
 
-APP_ROOT = Path(__file__).resolve().parent
-TEMPLATES_DIR = APP_ROOT / "web" / "templates"
-STATIC_DIR = APP_ROOT / "web" / "static"
+# Plain strings built with os.path, as in presets: no resolve() or per-use str() conversion.
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_DIR = os.path.join(APP_ROOT, "web", "templates")
+STATIC_DIR = os.path.join(APP_ROOT, "web", "static")
+TEMPLATE_CACHE_DIR = os.path.join(cache.CACHE_DIR, "jinja")
+
+_YT_SHORT = frozenset({"youtu.be", "www.youtu.be"})
+_YT_LONG = frozenset({"www.youtube.com", "youtube.com"})
+_HTTP_PREFIX = ("http://", "https://")
+
+# Canonical shapes resolved without urlparse/parse_qs; anything else takes the slow path.
+_WATCH_RE = re.compile(r"^https?://(?:www\.)?youtube\.com/watch\?v=([A-Za-z0-9_-]{11})(?:[&#]|$)")
+_SHORT_RE = re.compile(r"^https?://(?:www\.)?youtu\.be/([A-Za-z0-9_-]{11})(?:[?#]|$)")
+_ID_RE = re.compile(r"^([A-Za-z0-9_-]{11})$")
+
+# Appended to the user's prompt; kept apart so a long base prompt is not copied through format().
+_PROMPT_METADATA = """
+
+VIDEO METADATA (use exactly):
+- video_url: {}
+- title: {}
+- channel: {}
+- upload_date: {}
+
+Return ONLY valid JSON that matches the provided schema.
+"""
 
-app = FastAPI(title="YouTube Summarize")
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+BATCH_CONCURRENCY = 8
+# Every distinct item is a Gemini call, so one request may not queue more than this.
+BATCH_MAX_ITEMS = 100
+CLIENT_MAX_CONNECTIONS = 200
+RESULT_CACHE_MAXSIZE = 512
+RESULT_CACHE_TTL = 3600.0
+# Set by run_dev; the reloader's worker process inherits it and re-imports this module.
+DEV_MODE = os.environ.get("YOUTUBE_SUMMARIZE_DEV") == "1"
+
+_client: Optional[genai.Client] = None
+# Handlers only touch this from the event loop and never await mid-update, so no lock is needed.
+_result_cache: "OrderedDict[bytes, tuple[float, str]]" = OrderedDict()
+
+
+def get_client() -> genai.Client:
+    """Return the process-wide Gemini client so requests share its connection pool."""
+    global _client
+    if _client is None:
+        _client = create_client(load_api_key(), max_connections=CLIENT_MAX_CONNECTIONS)
+    return _client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    global _client
+    # Compile (or load the cached bytecode for) the page before the first request needs it.
+    templates.get_template("index.html")
+    try:
+        yield
+    finally:
+        # The client is created on first use, so pages that never call Gemini work without a key.
+        client, _client = _client, None
+        if client is not None:
+            client.close()
+            await client.aio.aclose()
+
+
+def _template_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    if DEV_MODE:
+        return None
+    try:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+
+
+app = FastAPI(title="YouTube Summarize", lifespan=lifespan)
+templates = Jinja2Templates(
+    env=Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=DEV_MODE,
+        bytecode_cache=_template_bytecode_cache(),
+    )
+)
 
-if STATIC_DIR.exists():
-    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+if os.path.isdir(STATIC_DIR):
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_video_url(value: str) -> str:
     raw = value.strip()
     if not raw:
         return ""
-    if raw.startswith("http://") or raw.startswith("https://"):
+    match = _WATCH_RE.match(raw) or _SHORT_RE.match(raw) or _ID_RE.match(raw)
+    if match:
+        return f"https://www.youtube.com/watch?v={match.group(1)}"
+    if raw.startswith(_HTTP_PREFIX):
         parsed = urlparse(raw)
-        if parsed.netloc in {"youtu.be", "www.youtu.be"}:
+        if parsed.netloc in _YT_SHORT:
             video_id = parsed.path.lstrip("/")
             return f"https://www.youtube.com/watch?v={video_id}"
-        if parsed.netloc in {"www.youtube.com", "youtube.com"}:
+        if parsed.netloc in _YT_LONG:
             qs = parse_qs(parsed.query)
             video_id = qs.get("v", [""])[0]
             if video_id:
@@ -55,22 +160,52 @@ def normalize_video_url(value: str) -> str:
 
 
 def build_prompt(base_prompt: str, meta: Dict[str, str]) -> str:
-    return f"""{base_prompt}
+    metadata = _PROMPT_METADATA.format(
+        meta["video_url"],
+        meta.get("title", ""),
+        meta.get("channel", ""),
+        meta.get("upload_date", ""),
+    )
+    return base_prompt + metadata
+
+
+def _result_key(video_url: str, model: str, prompt: str, schema: Dict[str, Any]) -> bytes:
+    digest = hashlib.blake2b(schema_key(schema), digest_size=16)
+    for part in (video_url, model, prompt):
+        digest.update(b"\0")
+        digest.update(part.encode("utf-8"))
+    return digest.digest()
+
+
+def _cached_result(key: bytes) -> Optional[str]:
+    entry = _result_cache.get(key)
+    if entry is None:
+        return None
+    expires, raw = entry
+    if expires < time.monotonic():
+        del _result_cache[key]
+        return None
+    _result_cache.move_to_end(key)
+    return raw
+
+
+def _remember_result(key: bytes, raw: str) -> None:
+    _result_cache[key] = (time.monotonic() + RESULT_CACHE_TTL, raw)
+    _result_cache.move_to_end(key)
+    if len(_result_cache) > RESULT_CACHE_MAXSIZE:
+        _result_cache.popitem(last=False)
 
-VIDEO METADATA (use exactly):
-- video_url: {meta["video_url"]}
-- title: {meta.get("title","")}
-- channel: {meta.get("channel","")}
-- upload_date: {meta.get("upload_date","")}
 
-Return ONLY valid JSON that matches the provided schema.
-"""
+def default_schema_json() -> str:
+    return _default_schema_json(preset_mtime_ns(DEFAULT_PRESET_ID))
 
 
-def default_schema_json() -> str:
+@functools.lru_cache(maxsize=1)
+def _default_schema_json(mtime_ns: Optional[int]) -> str:
+    # Keyed on the preset file's mtime, so saves from any worker and edits on disk are picked up.
     preset = load_preset_safe(DEFAULT_PRESET_ID)
     if preset and isinstance(preset.get("schema"), dict):
-        return json.dumps(preset["schema"], indent=2)
+        return jsonutil.dumps_pretty(preset["schema"])
     schema = {
         "type": "object",
         "properties": {
@@ -79,11 +214,32 @@ def default_schema_json() -> str:
         },
         "required": ["summary", "keyword"],
     }
-    return json.dumps(schema, indent=2)
+    return jsonutil.dumps_pretty(schema)
 
 
 
 
+def _ctx(
+    request: Request,
+    video_input: str,
+    prompt: str,
+    schema_json: str,
+    model: str,
+    *,
+    result_json: Optional[str] = None,
+    error: Optional[str] = None,
+) -> Dict[str, Any]:
+    return {
+        "request": request,
+        "default_prompt": prompt,
+        "default_schema": schema_json,
+        "default_model": model,
+        "video_input": video_input,
+        "result_json": result_json,
+        "error": error,
+    }
+
+
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request) -> HTMLResponse:
     default_preset = load_preset_safe(DEFAULT_PRESET_ID) or {}
@@ -102,7 +258,7 @@ def home(request: Request) -> HTMLResponse:
 
 
 @app.post("/summarize", response_class=HTMLResponse)
-def summarize(
+async def summarize(
     request: Request,
     video_input: str = Form(...),
     prompt: str = Form(...),
@@ -111,92 +267,252 @@ def summarize(
 ) -> HTMLResponse:
     video_url = normalize_video_url(video_input)
     if not video_url:
-        context = {
-            "request": request,
-            "default_prompt": prompt,
-            "default_schema": schema_json,
-            "default_model": model,
-            "result_json": None,
-            "error": "Provide a YouTube URL or video id.",
-            "video_input": video_input,
-        }
+        error = "Provide a YouTube URL or video id."
+        context = _ctx(request, video_input, prompt, schema_json, model, error=error)
         return templates.TemplateResponse("index.html", context)
 
     try:
-        schema = json.loads(schema_json)
+        schema = parse_schema_json(schema_json)
         if not isinstance(schema, dict):
             raise ValueError("Schema must be a JSON object.")
+        check_schema(schema)
     except Exception as exc:
-        context = {
-            "request": request,
-            "default_prompt": prompt,
-            "default_schema": schema_json,
-            "default_model": model,
-            "result_json": None,
-            "error": f"Invalid schema JSON: {exc}",
-            "video_input": video_input,
-        }
+        error = f"Invalid schema JSON: {exc}"
+        context = _ctx(request, video_input, prompt, schema_json, model, error=error)
         return templates.TemplateResponse("index.html", context)
 
-    api_key = load_api_key()
-    client = genai.Client(api_key=api_key)
-    meta = {"video_url": video_url, "title": "", "channel": "", "upload_date": ""}
-    full_prompt = build_prompt(prompt, meta)
-
+    key = _result_key(video_url, model, prompt, schema)
     try:
-        raw = summarize_custom(client=client, model=model, prompt=full_prompt, meta=meta, schema=schema)
-        parsed = json.loads(raw)
-        result_json = json.dumps(parsed, indent=2)
+        # Only valid JSON is cached, and the text is passed through as-is rather than re-indented.
+        result_json = _cached_result(key)
+        if result_json is None:
+            client = get_client()
+            meta = {"video_url": video_url, "title": "", "channel": "", "upload_date": ""}
+            full_prompt = build_prompt(prompt, meta)
+            result_json = await summarize_custom_async(
+                client=client, model=model, prompt=full_prompt, meta=meta, schema=schema
+            )
+            jsonutil.loads(result_json)
+            _remember_result(key, result_json)
     except Exception as exc:
-        context = {
-            "request": request,
-            "default_prompt": prompt,
-            "default_schema": schema_json,
-            "default_model": model,
-            "result_json": None,
-            "error": f"Summarization failed: {exc}",
-            "video_input": video_input,
-        }
+        error = f"Summarization failed: {exc}"
+        context = _ctx(request, video_input, prompt, schema_json, model, error=error)
         return templates.TemplateResponse("index.html", context)
 
-    context = {
-        "request": request,
-        "default_prompt": prompt,
-        "default_schema": schema_json,
-        "default_model": model,
-        "result_json": result_json,
-        "error": None,
-        "video_input": video_input,
-    }
+    context = _ctx(request, video_input, prompt, schema_json, model, result_json=result_json)
     return templates.TemplateResponse("index.html", context)
 
 
-@app.post("/api/summarize")
-async def summarize_api(payload: Dict[str, Any]) -> JSONResponse:
-    video_input = str(payload.get("video_input", "")).strip()
-    prompt = str(payload.get("prompt", SHARED_VIDEO_PROMPT))
-    schema = payload.get("schema")
-    model = str(payload.get("model", "gemini-3-flash-preview"))
+class SummarizeReq(BaseModel):
+    video_input: str = ""
+    prompt: str = SHARED_VIDEO_PROMPT
+    schema_: Dict[str, Any] = Field(alias="schema")
+    model: str = "gemini-3-flash-preview"
 
-    if not isinstance(schema, dict):
-        return JSONResponse(status_code=400, content={"error": "schema must be a JSON object"})
 
-    video_url = normalize_video_url(video_input)
+def _validation_message(errors: Sequence[Dict[str, Any]]) -> str:
+    error = errors[0]
+    where = ".".join(str(part) for part in error["loc"] if part != "body")
+    return f"{where}: {error['msg']}" if where else error["msg"]
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_error_handler(request: Request, exc: RequestValidationError) -> Response:
+    # The summarize endpoints report client errors as 400 {"error": ...}, which the UI reads.
+    if request.url.path.startswith("/api/summarize"):
+        return JSONResponse(status_code=400, content={"error": _validation_message(exc.errors())})
+    return await request_validation_exception_handler(request, exc)
+
+
+def _parse_summarize_req(req: SummarizeReq) -> tuple[str, str, Dict[str, Any], str]:
+    """Return (video_url, prompt, schema, model); ValueError messages are client-facing."""
+    check_schema(req.schema_)
+    video_url = normalize_video_url(req.video_input)
     if not video_url:
-        return JSONResponse(status_code=400, content={"error": "Provide a YouTube URL or video id."})
+        raise ValueError("Provide a YouTube URL or video id.")
+    return video_url, req.prompt, req.schema_, req.model
+
+
+async def _summarize_item(req: SummarizeReq) -> tuple[int, Any]:
+    # On success the content is the model's JSON text as-is; errors are dicts.
+    try:
+        video_url, prompt, schema, model = _parse_summarize_req(req)
+    except ValueError as exc:
+        return 400, {"error": str(exc)}
+
+    key = _result_key(video_url, model, prompt, schema)
+    raw = _cached_result(key)
+    if raw is not None:
+        return 200, raw
 
-    api_key = load_api_key()
-    client = genai.Client(api_key=api_key)
+    client = get_client()
     meta = {"video_url": video_url, "title": "", "channel": "", "upload_date": ""}
     full_prompt = build_prompt(prompt, meta)
 
-    raw = summarize_custom(client=client, model=model, prompt=full_prompt, meta=meta, schema=schema)
+    raw = await summarize_custom_async(
+        client=client, model=model, prompt=full_prompt, meta=meta, schema=schema
+    )
     try:
-        parsed = json.loads(raw)
-    except json.JSONDecodeError:
-        return JSONResponse(status_code=502, content={"error": "Model returned invalid JSON", "raw": raw})
+        jsonutil.loads(raw)
+    except ValueError:
+        return 502, {"error": "Model returned invalid JSON", "raw": raw}
 
-    return JSONResponse(content=parsed)
+    _remember_result(key, raw)
+    return 200, raw
+
+
+@app.post("/api/summarize")
+async def summarize_api(req: SummarizeReq) -> Response:
+    status_code, content = await _summarize_item(req)
+    if status_code == 200:
+        # Already validated JSON: send the model's bytes instead of parsing and re-encoding them.
+        return Response(content=content, media_type="application/json")
+    return JSONResponse(status_code=status_code, content=content)
+
+
+@app.post("/api/summarize-stream")
+async def summarize_stream_api(req: SummarizeReq) -> Response:
+    try:
+        video_url, prompt, schema, model = _parse_summarize_req(req)
+    except ValueError as exc:
+        return JSONResponse(status_code=400, content={"error": str(exc)})
+
+    key = _result_key(video_url, model, prompt, schema)
+    cached = _cached_result(key)
+    meta = {"video_url": video_url, "title": "", "channel": "", "upload_date": ""}
+    full_prompt = build_prompt(prompt, meta)
+
+    async def _lines() -> AsyncIterator[bytes]:
+        if cached is not None:
+            yield jsonutil.dumps({"delta": cached}) + b"\n"
+            yield jsonutil.dumps({"done": True}) + b"\n"
+            return
+        parts = []
+        try:
+            async for text in summarize_custom_stream(
+                client=get_client(), model=model, prompt=full_prompt, meta=meta, schema=schema
+            ):
+                parts.append(text)
+                yield jsonutil.dumps({"delta": text}) + b"\n"
+        except Exception as exc:
+            yield jsonutil.dumps({"error": f"Summarization failed: {exc}"}) + b"\n"
+            return
+        raw = "".join(parts)
+        try:
+            jsonutil.loads(raw)
+        except ValueError:
+            yield jsonutil.dumps({"error": "Model returned invalid JSON"}) + b"\n"
+            return
+        _remember_result(key, raw)
+        yield jsonutil.dumps({"done": True}) + b"\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+@app.post("/api/summarize-batch")
+async def summarize_batch_api(payload: Dict[str, Any]) -> JSONResponse:
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        return JSONResponse(status_code=400, content={"error": "items must be a non-empty list"})
+    if len(items) > BATCH_MAX_ITEMS:
+        error = f"items may hold at most {BATCH_MAX_ITEMS} entries"
+        return JSONResponse(status_code=400, content={"error": error})
+
+    if payload.get("use_batch_api"):
+        return await _submit_batch_job(payload, items)
+
+    # Top-level prompt/schema/model apply to every item unless the item overrides them.
+    defaults = {k: v for k, v in payload.items() if k not in ("items", "use_batch_api")}
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    # Items with the same video, prompt, schema and model share one task, so repeats cost nothing.
+    tasks: Dict[bytes, asyncio.Task[tuple[int, Any]]] = {}
+
+    async def _summarize(req: SummarizeReq) -> tuple[int, Any]:
+        async with semaphore:
+            try:
+                status_code, content = await _summarize_item(req)
+                if status_code == 200:
+                    content = jsonutil.loads(content)
+            except Exception as exc:
+                status_code, content = 502, {"error": f"Summarization failed: {exc}"}
+        return status_code, content
+
+    async def _one(item: Any) -> Dict[str, Any]:
+        if isinstance(item, str):
+            item = {"video_input": item}
+        if not isinstance(item, dict):
+            return {"status": 400, "result": {"error": "Each item must be a URL string or object."}}
+        try:
+            req = SummarizeReq.model_validate({**defaults, **item})
+            video_url, prompt, schema, model = _parse_summarize_req(req)
+        except ValidationError as exc:
+            return {"status": 400, "result": {"error": _validation_message(exc.errors())}}
+        except ValueError as exc:
+            return {"status": 400, "result": {"error": str(exc)}}
+        key = _result_key(video_url, model, prompt, schema)
+        task = tasks.get(key)
+        if task is None:
+            task = tasks[key] = asyncio.create_task(_summarize(req))
+        status_code, content = await task
+        return {"status": status_code, "result": content}
+
+    results = await asyncio.gather(*(_one(item) for item in items))
+    return JSONResponse(content={"results": results})
+
+
+async def _submit_batch_job(payload: Dict[str, Any], items: list[Any]) -> JSONResponse:
+    # One job runs one model with one response schema, so those must be set at the top level.
+    schema = payload.get("schema")
+    model = str(payload.get("model", "gemini-3-flash-preview"))
+    default_prompt = str(payload.get("prompt", SHARED_VIDEO_PROMPT))
+    if not isinstance(schema, dict):
+        return JSONResponse(status_code=400, content={"error": "schema must be a JSON object"})
+    try:
+        check_schema(schema)
+    except ValueError as exc:
+        return JSONResponse(status_code=400, content={"error": str(exc)})
+
+    requests = []
+    for index, item in enumerate(items):
+        if isinstance(item, str):
+            item = {"video_input": item}
+        video_input = item.get("video_input", "") if isinstance(item, dict) else ""
+        video_url = normalize_video_url(str(video_input))
+        if not video_url:
+            error = f"Item {index}: provide a YouTube URL or video id."
+            return JSONResponse(status_code=400, content={"error": error})
+        meta = {"video_url": video_url, "title": "", "channel": "", "upload_date": ""}
+        requests.append((build_prompt(str(item.get("prompt", default_prompt)), meta), video_url))
+
+    try:
+        name = await asyncio.to_thread(
+            submit_batch, client=get_client(), model=model, schema=schema, items=requests
+        )
+    except genai_errors.APIError as exc:
+        return JSONResponse(status_code=502, content={"error": f"Batch submission failed: {exc}"})
+    return JSONResponse(status_code=202, content={"batch": name, "count": len(requests)})
+
+
+@app.get("/api/summarize-batch/{name:path}")
+async def summarize_batch_status(name: str) -> JSONResponse:
+    try:
+        texts = await asyncio.to_thread(batch_results, get_client(), name)
+    except (RuntimeError, genai_errors.APIError) as exc:
+        return JSONResponse(status_code=502, content={"error": str(exc)})
+    if texts is None:
+        return JSONResponse(status_code=202, content={"batch": name, "state": "running"})
+
+    results = []
+    for text in texts:
+        if text is None:
+            results.append({"status": 502, "result": {"error": "No result returned."}})
+            continue
+        try:
+            results.append({"status": 200, "result": jsonutil.loads(text)})
+        except ValueError:
+            error = {"error": "Model returned invalid JSON", "raw": text}
+            results.append({"status": 502, "result": error})
+    return JSONResponse(content={"batch": name, "results": results})
 
 
 @app.post("/api/infer-schema")
@@ -207,11 +523,12 @@ async def infer_schema(payload: Dict[str, Any]) -> JSONResponse:
     if not prompt:
         return JSONResponse(status_code=400, content={"error": "Prompt is required."})
 
-    api_key = load_api_key()
-    client = genai.Client(api_key=api_key)
+    client = get_client()
 
     try:
-        schema = infer_schema_from_prompt(client=client, model=model, prompt_text=prompt)
+        schema = await asyncio.to_thread(
+            infer_schema_from_prompt, client=client, model=model, prompt_text=prompt
+        )
     except Exception as exc:
         return JSONResponse(status_code=502, content={"error": f"Schema inference failed: {exc}"})
 
@@ -260,4 +577,22 @@ async def presets_save(payload: Dict[str, Any]) -> JSONResponse:
 def run() -> None:
     import uvicorn
 
+    # "auto" picks uvloop and httptools when installed (e.g. via uvicorn[standard]).
+    uvicorn.run(
+        "youtube_summarize.webapp:app",
+        host="127.0.0.1",
+        port=8000,
+        workers=os.cpu_count() or 2,
+        loop="auto",
+        http="auto",
+        access_log=False,
+    )
+
+
+def run_dev() -> None:
+    """Single auto-reloading worker; use only while developing."""
+    import uvicorn
+
+    # Re-read edited templates on each render instead of serving the compiled cache.
+    os.environ["YOUTUBE_SUMMARIZE_DEV"] = "1"
     uvicorn.run("youtube_summarize.webapp:app", host="127.0.0.1", port=8000, reload=True)
@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from youtube_summarize import cache, gemini
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(cache, "_memory", cache._memory.__class__())
+    return tmp_path
+
+
+def test_make_key_separates_parts():
+    assert cache.make_key("ab", "c") != cache.make_key("a", "bc")
+    assert cache.make_key("a", "b") == cache.make_key("a", "b")
+
+
+def test_put_then_get_round_trips():
+    key = cache.make_key("model", "prompt")
+    assert cache.get(key) is None
+    cache.put(key, '{"summary": "ok"}')
+    assert cache.get(key) == '{"summary": "ok"}'
+
+
+def test_get_reads_from_disk_after_memory_is_cleared(cache_dir):
+    key = cache.make_key("model", "prompt")
+    cache.put(key, '{"summary": "ok"}')
+    assert (cache_dir / key[:2] / f"{key}.json").is_file()
+    cache._memory.clear()
+    assert cache.get(key) == '{"summary": "ok"}'
+
+
+def test_memory_layer_is_bounded(monkeypatch):
+    monkeypatch.setattr(cache, "MEMORY_MAXSIZE", 2)
+    for name in ("a", "b", "c"):
+        cache.put(cache.make_key(name), name)
+    assert list(cache._memory) == [cache.make_key("b"), cache.make_key("c")]
+
+
+def test_disk_helpers_leave_memory_alone():
+    key = cache.make_key("model", "prompt")
+    cache.write_disk(key, "{}")
+    assert not cache._memory
+    assert cache.read_disk(key) == "{}"
+    assert not cache._memory
+
+
+def test_async_request_uses_threads_for_disk_io(monkeypatch):
+    calls = []
+    to_thread = asyncio.to_thread
+
+    async def _to_thread(func, *args):
+        calls.append(func.__name__)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(gemini.asyncio, "to_thread", _to_thread)
+
+    async def _generate(model, contents, config):
+        async def _chunks():
+            yield SimpleNamespace(text='{"summary": "s"}')
+
+        return _chunks()
+
+    client = SimpleNamespace(
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content_stream=_generate))
+    )
+    contents = gemini.video_contents("https://www.youtube.com/watch?v=aaaaaaaaaaa", "Summarize.")
+    schema = {"type": "object"}
+
+    async def _request():
+        return await gemini.gemini_json_async(client, "m", schema, contents, use_cache=True)
+
+    assert asyncio.run(_request()) == '{"summary": "s"}'
+    assert calls == ["read_disk", "write_disk"]
+    # A memory hit is served inline, without a thread.
+    assert asyncio.run(_request()) == '{"summary": "s"}'
+    assert calls == ["read_disk", "write_disk"]
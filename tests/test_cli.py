@@ -0,0 +1,82 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from youtube_summarize import cli
+
+
+class _FakeModels:
+    def __init__(self):
+        self.urls = []
+
+    async def generate_content_stream(self, model, contents, config):
+        url = next(p.file_data.file_uri for p in contents.parts if p.file_data)
+        self.urls.append(url)
+        await asyncio.sleep(0.01)  # keep the first request in flight while duplicates arrive
+        text = '{"summary": 1}' if "bbbbbbbbbbb" in url else '{"summary": "s", "keyword": []}'
+
+        async def _chunks():
+            yield SimpleNamespace(text=text)
+
+        return _chunks()
+
+
+@pytest.fixture
+def models(monkeypatch):
+    models = _FakeModels()
+    monkeypatch.setattr(cli, "load_api_key", lambda: "key")
+    monkeypatch.setattr(
+        cli, "create_client", lambda *a, **k: SimpleNamespace(aio=SimpleNamespace(models=models))
+    )
+    return models
+
+
+def _run(tmp_path, monkeypatch, lines, *flags):
+    urls = tmp_path / "urls.txt"
+    urls.write_text("\n".join(lines), encoding="utf-8")
+    outdir = tmp_path / "out"
+    argv = ["youtube-summarize", "--input-file", str(urls), "--outdir", str(outdir), "--no-cache"]
+    monkeypatch.setattr(sys, "argv", argv + list(flags))
+    cli.main()
+    return outdir
+
+
+def test_duplicate_inputs_share_one_request(tmp_path, monkeypatch, capsys, models):
+    lines = [
+        "aaaaaaaaaaa",
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa",
+        "https://youtu.be/aaaaaaaaaaa",
+        "ccccccccccc",
+    ]
+    outdir = _run(tmp_path, monkeypatch, lines, "--concurrency", "4")
+
+    assert sorted(models.urls) == [
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa",
+        "https://www.youtube.com/watch?v=ccccccccccc",
+    ]
+    assert sorted(p.name for p in outdir.iterdir()) == ["aaaaaaaaaaa.json", "ccccccccccc.json"]
+    assert (outdir / "aaaaaaaaaaa.json").read_text() == '{"summary": "s", "keyword": []}'
+    assert "Skipped 2 duplicate input(s)." in capsys.readouterr().err
+
+
+def test_repeats_after_completion_reuse_the_written_file(tmp_path, monkeypatch, capsys, models):
+    lines = ["aaaaaaaaaaa", "ccccccccccc", "https://youtu.be/aaaaaaaaaaa"]
+    outdir = _run(tmp_path, monkeypatch, lines, "--concurrency", "1")
+
+    assert len(models.urls) == 2
+    assert (outdir / "aaaaaaaaaaa.json").read_text() == '{"summary": "s", "keyword": []}'
+    assert "Skipped 1 duplicate input(s)." in capsys.readouterr().err
+
+
+def test_repeated_invalid_video_is_reported_without_a_new_request(
+    tmp_path, monkeypatch, capsys, models
+):
+    lines = ["bbbbbbbbbbb", "aaaaaaaaaaa", "bbbbbbbbbbb"]
+    with pytest.raises(SystemExit, match="2 video"):
+        _run(tmp_path, monkeypatch, lines, "--concurrency", "1", "--validate")
+
+    assert len(models.urls) == 2
+    assert capsys.readouterr().err.count("bbbbbbbbbbb: skipped") == 2
+    assert [p.name for p in (tmp_path / "out").iterdir()] == ["aaaaaaaaaaa.json"]
@@ -0,0 +1,137 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.genai import errors as genai_errors
+
+from youtube_summarize import gemini
+from youtube_summarize.ratelimit import AsyncRateLimiter
+from youtube_summarize.schemas import VideoExtraction
+
+SCHEMA = {"type": "object", "properties": {"summary": {"type": "string"}}}
+META = {"video_url": "https://www.youtube.com/watch?v=aaaaaaaaaaa"}
+
+
+class _FakeModels:
+    """Fails with each queued error in turn, then streams ``text``."""
+
+    def __init__(self, *errors, text='{"summary": "s"}'):
+        self.errors = list(errors)
+        self.text = text
+        self.contents = []
+
+    def _respond(self, contents):
+        self.contents.append(contents)
+        if self.errors:
+            raise self.errors.pop(0)
+        return [SimpleNamespace(text=self.text)]
+
+    def generate_content_stream(self, model, contents, config):
+        return iter(self._respond(contents))
+
+    async def _agenerate(self, contents):
+        for chunk in self._respond(contents):
+            yield chunk
+
+
+class _FakeAioModels:
+    def __init__(self, models):
+        self.models = models
+
+    async def generate_content_stream(self, model, contents, config):
+        return self.models._agenerate(contents)
+
+
+def _client(models):
+    return SimpleNamespace(models=models, aio=SimpleNamespace(models=_FakeAioModels(models)))
+
+
+def _api_error(code, message="error"):
+    return genai_errors.APIError(code, {"error": {"code": code, "message": message}})
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    async def _sleep(delay):
+        return None
+
+    monkeypatch.setattr(gemini.time, "sleep", lambda delay: None)
+    monkeypatch.setattr(gemini.asyncio, "sleep", _sleep)
+
+
+def _has_file_data(contents):
+    return any(part.file_data for part in contents.parts)
+
+
+def test_unsupported_mime_falls_back_to_url_prompt():
+    models = _FakeModels(_api_error(400, "Unsupported MIME type: text/html"))
+    raw = gemini.summarize_custom(_client(models), "m", "Summarize.", META, SCHEMA)
+    assert raw == '{"summary": "s"}'
+    assert [_has_file_data(c) for c in models.contents] == [True, False]
+
+
+def test_retries_transient_errors_then_gives_up():
+    models = _FakeModels(*[_api_error(503)] * 3)
+    contents = gemini.video_contents(META["video_url"], "Summarize.")
+    with pytest.raises(RuntimeError, match="failed after retries"):
+        gemini.gemini_json(_client(models), "m", SCHEMA, contents, max_retries=3)
+    assert len(models.contents) == 3
+
+
+def test_non_retryable_error_raises_immediately():
+    models = _FakeModels(_api_error(403))
+    with pytest.raises(RuntimeError, match="request failed"):
+        asyncio.run(gemini.summarize_custom_async(_client(models), "m", "Summarize.", META, SCHEMA))
+    assert len(models.contents) == 1
+
+
+def test_throttling_halves_the_limiter_rate():
+    limiter = AsyncRateLimiter(1000, period=1.0, burst=10)
+    models = _FakeModels(_api_error(429))
+    raw = asyncio.run(
+        gemini.summarize_custom_async(
+            _client(models), "m", "Summarize.", META, SCHEMA, limiter=limiter
+        )
+    )
+    assert raw == '{"summary": "s"}'
+    assert limiter.rate == 501  # halved on the 429, then +1 for the success
+
+
+def test_stream_retries_before_first_chunk():
+    models = _FakeModels(_api_error(500), _api_error(400, "Unsupported MIME type"))
+
+    async def _collect():
+        stream = gemini.summarize_custom_stream(_client(models), "m", "Summarize.", META, SCHEMA)
+        return [text async for text in stream]
+
+    assert asyncio.run(_collect()) == ['{"summary": "s"}']
+    assert [_has_file_data(c) for c in models.contents] == [True, True, False]
+
+
+def test_extraction_to_json_matches_stdlib_output():
+    extraction = VideoExtraction(
+        video_url=META["video_url"],
+        title="Café — 東京",
+        story={"people": ["Zoë"]},
+        products=[
+            {
+                "what_it_does": "naïve",
+                "outcome": "success",
+                "outcome_reasoning": "…",
+                "metrics": [
+                    {"metric_type": "arr", "value": 1.5, "confidence": "high", "evidence": []}
+                ],
+            }
+        ],
+        top_takeaways=[],
+    )
+    expected = json.dumps(extraction.model_dump(), indent=2)
+    assert gemini.extraction_to_json(extraction) == expected
+    assert expected.isascii()
+
+
+def test_video_contents_sends_the_video_before_one_prompt_part():
+    contents = gemini.video_contents(META["video_url"], "Summarize.")
+    assert [part.file_data is not None for part in contents.parts] == [True, False]
+    assert contents.parts[1].text == "Summarize."
@@ -0,0 +1,24 @@
+import json
+
+from youtube_summarize import gemini, jsonutil
+
+BIG = 99999999999999999999  # wider than 64 bits, which orjson cannot encode
+
+
+def test_dumps_fall_back_for_wide_integers():
+    obj = {"b": BIG, "a": "é"}
+    assert (
+        jsonutil.dumps(obj) == json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+    )
+    assert jsonutil.dumps_sorted(obj) == '{"a":"é","b":99999999999999999999}'.encode()
+    assert json.loads(jsonutil.dumps_pretty(obj)) == obj
+
+
+def test_dumps_sorted_ignores_key_order():
+    assert jsonutil.dumps_sorted({"b": 1, "a": [2]}) == jsonutil.dumps_sorted({"a": [2], "b": 1})
+
+
+def test_schema_key_accepts_wide_integers():
+    schema = {"type": "integer", "maximum": BIG}
+    assert gemini.schema_key(schema) != gemini.schema_key({"type": "integer", "maximum": BIG + 1})
+    gemini.check_schema(schema)
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from youtube_summarize import presets
+
+
+@pytest.fixture(autouse=True)
+def presets_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(presets, "PRESETS_DIR", str(tmp_path))
+    presets._load_preset_cached.cache_clear()
+    yield tmp_path
+    presets._load_preset_cached.cache_clear()
+
+
+def _write(path, text, mtime_ns):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_load_preset_is_cached_until_the_file_changes(presets_dir):
+    path = presets_dir / "demo.json"
+    _write(path, '{"name": "One"}', 1_000_000_000)
+    first = presets.load_preset("demo")
+    assert first == {"name": "One"}
+    assert presets.load_preset("demo") is first
+
+    _write(path, '{"name": "Two"}', 2_000_000_000)
+    assert presets.load_preset("demo") == {"name": "Two"}
+
+
+def test_save_preset_is_visible_to_the_next_load():
+    presets.save_preset("demo", {"name": "One"})
+    assert presets.load_preset("demo") == {"name": "One"}
+    presets.save_preset("demo", {"name": "Two"})
+    assert presets.load_preset("demo") == {"name": "Two"}
+
+
+def test_missing_preset():
+    with pytest.raises(FileNotFoundError):
+        presets.load_preset("missing")
+    assert presets.load_preset_safe("missing") is None
+
+
+def test_save_preset_escapes_non_ascii(presets_dir):
+    presets.save_preset("demo", {"name": "Café"})
+    assert (presets_dir / "demo.json").read_text(encoding="utf-8") == '{\n  "name": "Caf\\u00e9"\n}'
+
+
+def test_list_presets_sees_in_place_rewrites(presets_dir):
+    path = presets_dir / "demo.json"
+    _write(path, '{"name": "One"}', 1_000_000_000)
+    dir_mtime = presets_dir.stat().st_mtime_ns
+    assert presets.list_presets() == [{"id": "demo", "name": "One"}]
+
+    # Another worker rewrites the file: the directory mtime does not change.
+    _write(path, '{"name": "Two"}', 2_000_000_000)
+    os.utime(presets_dir, ns=(dir_mtime, dir_mtime))
+    assert presets.list_presets() == [{"id": "demo", "name": "Two"}]
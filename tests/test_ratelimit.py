@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from youtube_summarize.ratelimit import AsyncRateLimiter
+
+
+def test_throttle_halves_rate_down_to_floor():
+    limiter = AsyncRateLimiter(60, min_rate=10)
+    limiter.on_throttle()
+    assert limiter.rate == 30
+    limiter.on_throttle()
+    assert limiter.rate == 15
+    limiter.on_throttle()
+    assert limiter.rate == 10
+
+
+def test_success_adds_one_up_to_max():
+    limiter = AsyncRateLimiter(4)
+    limiter.on_throttle()
+    assert limiter.rate == 2
+    limiter.on_success()
+    assert limiter.rate == 3
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.rate == 4
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        AsyncRateLimiter(0)
+
+
+def test_acquire_waits_for_refill():
+    # 20 requests per second with a burst of one: the third permit comes ~0.1s after the first.
+    limiter = AsyncRateLimiter(20, period=1.0)
+
+    async def _acquire_three() -> float:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(3):
+            async with limiter:
+                pass
+        return loop.time() - start
+
+    assert asyncio.run(_acquire_three()) >= 0.09
@@ -0,0 +1,71 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from youtube_summarize import cli, webapp
+
+INPUTS = [
+    "",
+    "   ",
+    "dQw4w9WgXcQ",
+    "  dQw4w9WgXcQ  ",
+    "short",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "http://youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42s",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ#comments",
+    "https://www.youtube.com/watch?list=PL1&v=dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQextra",
+    "https://www.youtube.com/watch",
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ",
+    "https://www.youtu.be/dQw4w9WgXcQ?t=10",
+    "https://youtu.be/dQw4w9WgXcQ#t=10",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://example.com/watch?v=dQw4w9WgXcQ",
+    "ftp://youtu.be/dQw4w9WgXcQ",
+]
+
+
+# The urlparse-based helpers used before parse_video and the web regex fast path.
+def _legacy_normalize(value: str) -> str:
+    raw = value.strip()
+    if not raw:
+        return ""
+    if raw.startswith("http://") or raw.startswith("https://"):
+        parsed = urlparse(raw)
+        if parsed.netloc in {"youtu.be", "www.youtu.be"}:
+            video_id = parsed.path.lstrip("/")
+            return f"https://www.youtube.com/watch?v={video_id}"
+        if parsed.netloc in {"www.youtube.com", "youtube.com"}:
+            qs = parse_qs(parsed.query)
+            video_id = qs.get("v", [""])[0]
+            if video_id:
+                return f"https://www.youtube.com/watch?v={video_id}"
+        return raw
+    return f"https://www.youtube.com/watch?v={raw}"
+
+
+def _legacy_video_id(value: str) -> str:
+    raw = value.strip()
+    if not raw:
+        return ""
+    if raw.startswith("http://") or raw.startswith("https://"):
+        parsed = urlparse(raw)
+        if parsed.netloc in {"youtu.be", "www.youtu.be"}:
+            return parsed.path.lstrip("/")
+        if parsed.netloc in {"www.youtube.com", "youtube.com"}:
+            qs = parse_qs(parsed.query)
+            return qs.get("v", [""])[0]
+    return raw
+
+
+@pytest.mark.parametrize("value", INPUTS)
+def test_cli_parse_video_matches_urlparse(value):
+    assert cli.parse_video(value) == (_legacy_normalize(value), _legacy_video_id(value))
+
+
+@pytest.mark.parametrize("value", INPUTS)
+def test_webapp_normalize_matches_urlparse(value):
+    # The web app's regex fast path must agree with the old urlparse normalizer.
+    assert webapp.normalize_video_url(value) == _legacy_normalize(value)
@@ -0,0 +1,226 @@
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from youtube_summarize import jsonutil, presets, webapp
+
+SCHEMA = {"type": "object", "properties": {"u": {"type": "string"}}}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace Gemini with a fake that echoes the video URL and records each request."""
+    calls = []
+
+    async def _summarize(client, model, prompt, meta, schema):
+        calls.append(meta["video_url"])
+        await asyncio.sleep(0.01)
+        return jsonutil.dumps({"u": meta["video_url"], "model": model}).decode("utf-8")
+
+    monkeypatch.setattr(webapp, "summarize_custom_async", _summarize)
+    monkeypatch.setattr(webapp, "get_client", lambda: object())
+    monkeypatch.setattr(webapp, "_result_cache", webapp._result_cache.__class__())
+    return calls
+
+
+@pytest.fixture
+def client():
+    return TestClient(webapp.app)
+
+
+@pytest.fixture
+def presets_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(presets, "PRESETS_DIR", str(tmp_path))
+    presets._load_preset_cached.cache_clear()
+    webapp._default_schema_json.cache_clear()
+    yield tmp_path
+    presets._load_preset_cached.cache_clear()
+    webapp._default_schema_json.cache_clear()
+
+
+def test_default_schema_follows_the_preset_file(presets_dir):
+    assert "keyword" in jsonutil.loads(webapp.default_schema_json())["properties"]
+
+    path = presets_dir / f"{presets.DEFAULT_PRESET_ID}.json"
+    path.write_text('{"schema": {"type": "object", "title": "One"}}', encoding="utf-8")
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    assert jsonutil.loads(webapp.default_schema_json())["title"] == "One"
+
+    path.write_text('{"schema": {"type": "object", "title": "Two"}}', encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert jsonutil.loads(webapp.default_schema_json())["title"] == "Two"
+
+
+def test_batch_applies_defaults_and_item_overrides(client, calls):
+    body = {
+        "items": ["aaaaaaaaaaa", {"video_input": "bbbbbbbbbbb", "model": "other"}],
+        "schema": SCHEMA,
+    }
+    response = client.post("/api/summarize-batch", json=body)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == [200, 200]
+    assert results[0]["result"]["model"] == "gemini-3-flash-preview"
+    assert results[1]["result"] == {
+        "u": "https://www.youtube.com/watch?v=bbbbbbbbbbb",
+        "model": "other",
+    }
+
+
+def test_batch_sends_identical_items_once(client, calls):
+    items = ["aaaaaaaaaaa", "https://youtu.be/aaaaaaaaaaa", {"video_input": "aaaaaaaaaaa"}]
+    response = client.post("/api/summarize-batch", json={"items": items, "schema": SCHEMA})
+    results = response.json()["results"]
+    assert len(calls) == 1
+    assert len(results) == 3
+    assert all(r == results[0] for r in results)
+
+
+def test_batch_reports_bad_items_individually(client, calls):
+    items = ["aaaaaaaaaaa", 7, {"video_input": "aaaaaaaaaaa", "schema": []}, {"video_input": ""}]
+    response = client.post("/api/summarize-batch", json={"items": items, "schema": SCHEMA})
+    assert [r["status"] for r in response.json()["results"]] == [200, 400, 400, 400]
+
+
+@pytest.mark.parametrize("items", [None, [], ["aaaaaaaaaaa"] * (webapp.BATCH_MAX_ITEMS + 1)])
+def test_batch_rejects_missing_empty_or_oversized_items(client, calls, items):
+    response = client.post("/api/summarize-batch", json={"items": items, "schema": SCHEMA})
+    assert response.status_code == 400
+    assert "items" in response.json()["error"]
+    assert calls == []
+
+
+def test_batch_api_submits_one_job(client, monkeypatch):
+    submitted = {}
+
+    def _submit(client, model, schema, items):
+        submitted.update(model=model, schema=schema, items=items)
+        return "batches/123"
+
+    monkeypatch.setattr(webapp, "submit_batch", _submit)
+    monkeypatch.setattr(webapp, "get_client", lambda: object())
+    body = {"items": ["aaaaaaaaaaa", "bbbbbbbbbbb"], "schema": SCHEMA, "use_batch_api": True}
+    response = client.post("/api/summarize-batch", json=body)
+
+    assert response.status_code == 202
+    assert response.json() == {"batch": "batches/123", "count": 2}
+    assert submitted["schema"] == SCHEMA
+    assert [url for _, url in submitted["items"]] == [
+        "https://www.youtube.com/watch?v=aaaaaaaaaaa",
+        "https://www.youtube.com/watch?v=bbbbbbbbbbb",
+    ]
+
+
+def test_batch_api_needs_a_top_level_schema(client, monkeypatch):
+    monkeypatch.setattr(webapp, "submit_batch", pytest.fail)
+    body = {"items": [{"video_input": "aaaaaaaaaaa", "schema": SCHEMA}], "use_batch_api": True}
+    response = client.post("/api/summarize-batch", json=body)
+    assert response.status_code == 400
+
+
+def test_batch_status_while_running(client, monkeypatch):
+    monkeypatch.setattr(webapp, "batch_results", lambda client, name: None)
+    monkeypatch.setattr(webapp, "get_client", lambda: object())
+    response = client.get("/api/summarize-batch/batches/123")
+    assert response.status_code == 202
+    assert response.json() == {"batch": "batches/123", "state": "running"}
+
+
+def test_batch_status_reports_each_row(client, monkeypatch):
+    rows = ['{"u": "a"}', None, "not json"]
+    monkeypatch.setattr(webapp, "batch_results", lambda client, name: rows)
+    monkeypatch.setattr(webapp, "get_client", lambda: object())
+    response = client.get("/api/summarize-batch/batches/123")
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == [200, 502, 502]
+    assert results[0]["result"] == {"u": "a"}
+    assert results[2]["result"]["raw"] == "not json"
+
+
+def _ndjson(response):
+    return [jsonutil.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.fixture
+def stream_chunks(monkeypatch):
+    chunks = ['{"u": ', '"a"}']
+
+    async def _stream(client, model, prompt, meta, schema):
+        for chunk in chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    monkeypatch.setattr(webapp, "summarize_custom_stream", _stream)
+    monkeypatch.setattr(webapp, "get_client", lambda: object())
+    monkeypatch.setattr(webapp, "_result_cache", webapp._result_cache.__class__())
+    return chunks
+
+
+def test_stream_sends_deltas_then_done_and_caches(client, stream_chunks):
+    body = {"video_input": "aaaaaaaaaaa", "schema": SCHEMA}
+    response = client.post("/api/summarize-stream", json=body)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert _ndjson(response) == [{"delta": '{"u": '}, {"delta": '"a"}'}, {"done": True}]
+
+    stream_chunks[:] = [RuntimeError("should be cached")]
+    response = client.post("/api/summarize-stream", json=body)
+    assert _ndjson(response) == [{"delta": '{"u": "a"}'}, {"done": True}]
+
+
+def test_stream_reports_failures_in_band(client, stream_chunks):
+    stream_chunks[:] = ['{"u": ', RuntimeError("boom")]
+    body = {"video_input": "aaaaaaaaaaa", "schema": SCHEMA}
+    lines = _ndjson(client.post("/api/summarize-stream", json=body))
+    assert lines[0] == {"delta": '{"u": '}
+    assert "boom" in lines[-1]["error"]
+
+    stream_chunks[:] = ['{"u": ']
+    lines = _ndjson(client.post("/api/summarize-stream", json=body))
+    assert lines[-1] == {"error": "Model returned invalid JSON"}
+
+
+def test_summarize_accepts_schemas_with_wide_integers(client, calls):
+    schema = {"type": "object", "properties": {"n": {"type": "integer", "maximum": 10**20}}}
+    response = client.post("/api/summarize", json={"video_input": "aaaaaaaaaaa", "schema": schema})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "body, error",
+    [
+        ({"video_input": "aaaaaaaaaaa"}, "schema: Field required"),
+        (
+            {"video_input": "aaaaaaaaaaa", "schema": []},
+            "schema: Input should be a valid dictionary",
+        ),
+        ({"video_input": "", "schema": SCHEMA}, "Provide a YouTube URL or video id."),
+        ({"video_input": "aaaaaaaaaaa", "schema": {"type": "objekt"}}, "Invalid JSON Schema"),
+    ],
+)
+@pytest.mark.parametrize("path", ["/api/summarize", "/api/summarize-stream"])
+def test_summarize_rejects_bad_requests_with_400_error(client, calls, path, body, error):
+    response = client.post(path, json=body)
+    assert response.status_code == 400
+    assert response.json()["error"].startswith(error)
+    assert calls == []
+
+
+def test_summarize_returns_model_json_and_defaults(client, calls):
+    response = client.post("/api/summarize", json={"video_input": "aaaaaaaaaaa", "schema": SCHEMA})
+    assert response.status_code == 200
+    assert response.json() == {
+        "u": "https://www.youtube.com/watch?v=aaaaaaaaaaa",
+        "model": "gemini-3-flash-preview",
+    }
+
+
+def test_other_routes_keep_the_default_422(client):
+    response = client.post(
+        "/api/presets", content=b"not json", headers={"content-type": "application/json"}
+    )
+    assert response.status_code == 422
+    assert "detail" in response.json()